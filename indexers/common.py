@@ -0,0 +1,250 @@
+from abc import ABC, abstractmethod
+import asyncio
+import aiohttp
+from concurrent.futures import ThreadPoolExecutor
+from selectolax.lexbor import LexborHTMLParser
+import json
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+import random
+import signal
+from typing import Dict, Iterator, Optional, Tuple
+from pathlib import Path
+import logging
+import re
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+TITLED_ANCHORS = "a[title]"
+VIDEO_EXTENSIONS = (".mkv", ".mp4")
+USER_AGENT = "Mozilla/5.0 (compatible; movieHub-indexer)"
+MAX_CONCURRENCY = 64
+PARSER_WORKERS = 32
+COMPACT_EVERY = 1000
+MAX_BACKOFF = 30.0
+MAX_RETRY_AFTER = 300.0
+
+NAME_INDICATORS = re.compile(
+    r"\b(?:1080p|720p|2160p|480p|BluRay|WEB-DL|HEVC|x264|x265|WEBRip|BRRip|HDTV|DVDRip)\b",
+    re.IGNORECASE
+)
+RESOLUTIONS = tuple((res, res.upper()) for res in ("720p", "1080p", "2160p", "480p", "360p"))
+CODECS = tuple((codec, codec.upper()) for codec in ("HEVC", "x264", "x265", "AVC", "H264", "H.264", "H265", "H.265"))
+SOURCES = tuple((source, source.upper()) for source in ("WEB-DL", "WEBRip", "BRRip", "BluRay", "HDTV", "DVDRip", "NF"))
+BIT_DEPTHS = tuple((depth, depth.upper()) for depth in ("8bit", "10bit"))
+QUALITY_NEEDLES = {
+    "resolution": RESOLUTIONS,
+    "codec": CODECS,
+    "source": SOURCES,
+    "bit_depth": BIT_DEPTHS
+}
+QUALITY_PATTERN = re.compile("|".join(
+    f"(?P<{field}>{'|'.join(re.escape(needle) for _, needle in needles)})"
+    for field, needles in QUALITY_NEEDLES.items()
+))
+QUALITY_RANKS = {
+    field: {needle: (rank, value) for rank, (value, needle) in enumerate(needles)}
+    for field, needles in QUALITY_NEEDLES.items()
+}
+
+class BaseIndexer(ABC):
+    def __init__(self, save_file: str, log_file: str):
+        self.save_file = Path(save_file)
+        self.journal_file = self.save_file.with_suffix(".jsonl")
+        self.working_index = [2, 3, 4, 5, 11, 12]
+
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.semaphore: Optional[asyncio.Semaphore] = None
+        self.parser_pool: Optional[ThreadPoolExecutor] = None
+        self._journal = None
+        self._dirty_count = 0
+        self._in_flight = set()
+
+        logging.basicConfig(
+            level=logging.INFO,
+            format="%(asctime)s - %(levelname)s - %(message)s",
+            filename=log_file
+        )
+
+    @abstractmethod
+    def _load_progress(self) -> Dict:
+        ...
+
+    @abstractmethod
+    async def _index_host(self, index: int, indexes: Dict) -> None:
+        ...
+
+    def _read_json(self) -> Dict:
+        if orjson is not None:
+            return orjson.loads(self.save_file.read_bytes())
+        with open(self.save_file, "r") as f:
+            return json.load(f)
+
+    def _encode(self, record: Dict) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(record)
+        return json.dumps(record).encode()
+
+    def _decode(self, line: bytes) -> Dict:
+        if orjson is not None:
+            return orjson.loads(line)
+        return json.loads(line)
+
+    def _journal_records(self) -> Iterator[Dict]:
+        try:
+            with open(self.journal_file, "rb") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    try:
+                        yield self._decode(line)
+                    except ValueError:
+                        logging.warning(f"Skipping unreadable journal line in {self.journal_file}")
+        except FileNotFoundError:
+            return
+
+    def _save_progress(self, indexes: Dict, final: bool = False) -> None:
+        tmp_file = self.save_file.with_suffix(".tmp")
+        if orjson is not None:
+            option = orjson.OPT_SORT_KEYS | orjson.OPT_INDENT_2 if final else 0
+            tmp_file.write_bytes(orjson.dumps(indexes, option=option))
+        else:
+            with open(tmp_file, "w+") as f:
+                if final:
+                    json.dump(indexes, fp=f, indent=2, sort_keys=True)
+                else:
+                    json.dump(indexes, fp=f)
+        tmp_file.replace(self.save_file)
+
+    def _compact(self, indexes: Dict, final: bool = False) -> None:
+        self._save_progress(indexes, final)
+        self._journal.seek(0)
+        self._journal.truncate()
+        self._dirty_count = 0
+
+    def _record_progress(self, indexes: Dict, record: Dict) -> None:
+        self._journal.write(self._encode(record) + b"\n")
+        self._journal.flush()
+        self._dirty_count += 1
+        if self._dirty_count >= COMPACT_EVERY:
+            self._compact(indexes)
+
+    async def _get_bytes(self, url: str, retries: int = 3) -> Optional[bytes]:
+        for attempt in range(retries):
+            retry_after = None
+            try:
+                async with self.semaphore:
+                    async with self.session.get(url) as response:
+                        if response.ok:
+                            return await response.read()
+                        logging.warning(f"Failed to fetch {url}: Status {response.status}")
+                        if response.status != 429 and response.status < 500:
+                            return None
+                        retry_after = response.headers.get("Retry-After")
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logging.error(f"Attempt {attempt + 1} failed for {url}: {str(e)}")
+            if attempt < retries - 1:
+                await asyncio.sleep(self._retry_delay(attempt, retry_after))
+        return None
+
+    @staticmethod
+    def _retry_delay(attempt: int, retry_after: Optional[str]) -> float:
+        if retry_after:
+            try:
+                delay = float(retry_after)
+            except ValueError:
+                try:
+                    delay = (parsedate_to_datetime(retry_after) - datetime.now(timezone.utc)).total_seconds()
+                except (TypeError, ValueError):
+                    delay = None
+            if delay is not None:
+                return min(MAX_RETRY_AFTER, max(0.0, delay))
+        return min(MAX_BACKOFF, 2 ** attempt + random.uniform(0, 1))
+
+    async def _parse(self, content: bytes) -> LexborHTMLParser:
+        return await asyncio.get_running_loop().run_in_executor(
+            self.parser_pool, LexborHTMLParser, content
+        )
+
+    async def _fetch(self, url: str, retries: int = 3) -> Optional[LexborHTMLParser]:
+        content = await self._get_bytes(url, retries)
+        if content is None:
+            return None
+        return await self._parse(content)
+
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _scan_quality(text: str) -> Tuple[Tuple[Tuple[str, int, str], ...], bool]:
+        search_text = text.upper()
+        best = {}
+        for match in QUALITY_PATTERN.finditer(search_text):
+            field = match.lastgroup
+            rank, value = QUALITY_RANKS[field][match.group()]
+            if field not in best or rank < best[field][0]:
+                best[field] = (rank, value)
+        matches = tuple((field, rank, value) for field, (rank, value) in best.items())
+        return matches, "NF." in search_text
+
+    def _extract_quality(self, url: str, filename: str) -> Dict[str, str]:
+        quality_info = {
+            "resolution": "unknown",
+            "codec": "unknown",
+            "source": "unknown",
+            "bit_depth": "unknown"
+        }
+
+        # The directory part is shared by every file below it, so it is scanned
+        # separately and served from the cache for all but the first file.
+        directory, _, basename = url.rpartition("/")
+        best = {}
+        netflix = False
+        for text in (f"{directory}/", f"{basename} {filename}"):
+            matches, has_netflix = self._scan_quality(text)
+            netflix = netflix or has_netflix
+            for field, rank, value in matches:
+                if field not in best or rank < best[field][0]:
+                    best[field] = (rank, value)
+        for field, (_, value) in best.items():
+            quality_info[field] = value
+
+        if netflix:
+            quality_info["source"] = "NF"
+
+        return quality_info
+
+    async def create_index(self):
+        indexes = self._load_progress()
+        self._journal = open(self.journal_file, "ab")
+        loop = asyncio.get_running_loop()
+        try:
+            loop.add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+        except NotImplementedError:
+            pass
+        self.semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
+        self.parser_pool = ThreadPoolExecutor(max_workers=PARSER_WORKERS)
+        self.session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=256, limit_per_host=MAX_CONCURRENCY),
+            timeout=aiohttp.ClientTimeout(total=None, sock_connect=10, sock_read=10),
+            headers={"User-Agent": USER_AGENT}
+        )
+        try:
+            start_index = indexes.get("last_processed", {}).get("index", self.working_index[0])
+            start_pos = self.working_index.index(start_index)
+
+            for index in self.working_index[start_pos:]:
+                await self._index_host(index, indexes)
+
+            indexes.pop("last_processed", None)
+        finally:
+            self._compact(indexes, final=True)
+            self._journal.close()
+            try:
+                loop.remove_signal_handler(signal.SIGTERM)
+            except NotImplementedError:
+                pass
+            await self.session.close()
+            self.parser_pool.shutdown()
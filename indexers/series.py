@@ -1,57 +1,42 @@
-import requests
-import bs4
-import json
+import asyncio
 from datetime import datetime
-from time import sleep
-from typing import Dict, Optional, Tuple
-from pathlib import Path
+from typing import Dict, Tuple
 from urllib.parse import urljoin
-from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn
 import logging
 
-class SeriesIndexer:
+from indexers.common import BaseIndexer, NAME_INDICATORS, TITLED_ANCHORS, VIDEO_EXTENSIONS
+
+class SeriesIndexer(BaseIndexer):
     def __init__(self, save_file: str = "output/series.json"):
-        self.save_file = Path(save_file)
-        self.working_index = [2, 3, 4, 5, 11, 12]
+        super().__init__(save_file, "log/series.log")
         self.processed_urls = set()
-
-        logging.basicConfig(
-            level=logging.INFO,
-            format="%(asctime)s - %(levelname)s - %(message)s",
-            filename="log/series.log"
-        )
+        self.series_by_title: Dict[str, Dict[str, Dict]] = {}
 
     def _load_progress(self) -> Dict:
         try:
-            with open(self.save_file, "r") as f:
-                data = json.load(f)
-                for year_data in data.get("series", {}).values():
-                    for series in year_data:
-                        self.processed_urls.add(series["url"])
-                        for content_url in series.get("content", []):
-                            self.processed_urls.add(content_url)
-                return data
+            data = self._read_json()
         except FileNotFoundError:
-            return {"series": {}, "last_processed": {"index": 2, "series": 0}}
-
-    def _save_progress(self, indexes: Dict) -> None:
-        with open(self.save_file, "w+") as f:
-            json.dump(indexes, fp=f, indent=8, sort_keys=True)
-
-    def _fetch(self, url: str, retries: int = 3) -> Optional[bs4.BeautifulSoup]:
-        for attempt in range(retries):
-            try:
-                response = requests.get(url, timeout=10)
-                if response.ok:
-                    return bs4.BeautifulSoup(response.content, "html.parser")
-                logging.warning(f"Failed to fetch {url}: Status {response.status_code}")
-            except requests.RequestException as e:
-                logging.error(f"Attempt {attempt + 1} failed for {url}: {str(e)}")
-                if attempt < retries - 1:
-                    sleep(2)
-        return None
-
-    def _extract_series_info(self, url: str) -> Tuple[str, str, str]:
+            data = {"series": {}, "last_processed": {"index": 2, "series": 0}}
+
+        for year_key, year_data in data.get("series", {}).items():
+            titles = self.series_by_title.setdefault(year_key, {})
+            for series in year_data:
+                titles.setdefault(series["title"], series)
+                self.processed_urls.add(series["url"])
+                for content_url in series.get("content", []):
+                    self.processed_urls.add(content_url)
+        self._replay_journal(data)
+        return data
+
+    def _replay_journal(self, data: Dict) -> None:
+        for record in self._journal_records():
+            if record["detail"]["url"] in self.processed_urls:
+                continue
+            self._add_episode(data, record)
+            self.processed_urls.add(record["detail"]["url"])
+
+    @staticmethod
+    def _extract_series_info(url: str) -> Tuple[str, str, str]:
         parts = url.split("Series/")
         if len(parts) < 2:
             return "", "", ""
@@ -63,82 +48,57 @@ class SeriesIndexer:
             if part.isdigit() and len(part) == 4:
                 year = part
                 if i + 1 < len(path_parts):
-                    series_name = path_parts[i + 1].replace(".", " ").strip()
-                    indicators = [
-                        "1080p", "720p", "2160p", "480p", "BluRay", "WEB-DL",
-                        "HEVC", "x264", "x265", "WEBRip", "BRRip", "HDTV", "DVDRip"
-                    ]
-                    for indicator in indicators:
-                        series_name = series_name.replace(indicator, "").strip()
-                    if year in series_name:
-                        series_name = series_name.replace(year, "").strip()
+                    series_name = NAME_INDICATORS.sub("", path_parts[i + 1].replace(".", " "))
+                    series_name = series_name.replace(year, "").strip()
             elif part.lower().startswith("s") and part[1:].isdigit():
                 season = part
             elif "season" in part.lower() and any(c.isdigit() for c in part):
                 season = f"S{int(''.join(c for c in part if c.isdigit())):02d}"
-                print(season)
+                logging.debug("season=%s", season)
 
         return year, series_name, season
 
-    def _extract_quality(self, url: str, filename: str) -> Dict[str, str]:
-        quality_info = {
-            "resolution": "unknown",
-            "codec": "unknown",
-            "source": "unknown",
-            "bit_depth": "unknown"
-        }
-
-        resolutions = ["720p", "1080p", "2160p", "480p", "360p"]
-        codecs = ["x264", "x265", "HEVC", "AVC", "H264", "H.264", "H265", "H.265"]
-        sources = ["WEB-DL", "WEBRip", "BRRip", "BluRay", "HDTV", "DVDRip", "NF"]
-        bit_depths = ["8bit", "10bit", "10Bit", "8Bit"]
-
-        search_text = f"{url} {filename}".upper()
-
-        for res in resolutions:
-            if res.upper() in search_text:
-                quality_info["resolution"] = res
-                break
-
-        for codec in codecs:
-            if codec.upper() in search_text:
-                quality_info["codec"] = codec
-                break
-
-        for source in sources:
-            if source.upper() in search_text:
-                quality_info["source"] = source
-                break
-
-        for depth in bit_depths:
-            if depth.upper() in search_text:
-                quality_info["bit_depth"] = depth.lower()
-                break
-
-        if "HEVC" in search_text:
-            quality_info["codec"] = "HEVC"
-        if "NF." in search_text or ".NF." in search_text:
-            quality_info["source"] = "NF"
-
-        return quality_info
-
-    def _process_series(self, series_url: str, indexes: Dict) -> None:
-
-        if series_url in self.processed_urls:
-            return
+    async def _process_series(self, series_url: str, indexes: Dict) -> None:
 
-        soup = self._fetch(series_url)
-        if not soup:
+        if series_url in self.processed_urls or series_url in self._in_flight:
             return
 
-        year, series_name, _ = self._extract_series_info(series_url)
-
-        self._recursive_fetch(series_url, indexes, year, year, series_name)
-        self.processed_urls.add(series_url)
-
-        self._save_progress(indexes)
-
-    def _recursive_fetch(self, base_url: str, indexes: Dict, year_title: str, year: str, series_name: str) -> None:
+        self._in_flight.add(series_url)
+        try:
+            content = await self._get_bytes(series_url)
+            if content is None:
+                return
+
+            year, series_name, _ = self._extract_series_info(series_url)
+
+            await self._recursive_fetch(series_url, indexes, year, year, series_name, content)
+            self.processed_urls.add(series_url)
+        finally:
+            self._in_flight.discard(series_url)
+
+    def _add_episode(self, indexes: Dict, record: Dict) -> None:
+        quality_detail_entry = record["detail"]
+        titles = self.series_by_title.setdefault(record["key"], {})
+        existing_series = titles.get(record["title"])
+        if existing_series:
+            existing_series["content"].append(quality_detail_entry["url"])
+            existing_series["extra_info"]["quality_details"].append(quality_detail_entry)
+        else:
+            titles[record["title"]] = {
+                "title": record["title"],
+                "url": record["url"],
+                "content": [quality_detail_entry["url"]],
+                "extra_info": {
+                    "added_date": record["added_date"],
+                    "extracted_name": "",
+                    "extracted_year": "",
+                    "quality_details": [quality_detail_entry]
+                }
+            }
+            indexes["series"].setdefault(record["key"], []).append(titles[record["title"]])
+
+    async def _recursive_fetch(self, base_url: str, indexes: Dict, year_title: str, year: str, series_name: str,
+                               base_content: bytes) -> None:
         stack = [base_url]
         visited = set()
 
@@ -148,19 +108,22 @@ class SeriesIndexer:
                 continue
 
             visited.add(current_url)
-            soup = self._fetch(current_url)
-            if not soup:
+            if current_url == base_url:
+                content = base_content
+            else:
+                content = await self._get_bytes(current_url)
+            if content is None:
                 continue
+            soup = await self._parse(content)
 
-            links = soup.find_all("a")
-            for link in links:
-                if not link.get("title"):
+            for link in soup.css(TITLED_ANCHORS):
+                href = link.attributes.get("href")
+                if not link.attributes.get("title") or not href:
                     continue
                 
-                href = link.get("href")
                 full_url = urljoin(current_url, href)
 
-                if any(href.endswith(ext) for ext in ["mkv", "mp4"]):
+                if href.endswith(VIDEO_EXTENSIONS):
                     quality_info = self._extract_quality(full_url, href)
                     
                     quality_detail_entry = {
@@ -169,51 +132,38 @@ class SeriesIndexer:
                         "url": full_url
                     }
                     
-                    series_entry = indexes["series"].setdefault(year_title.lower(), [])
-                    existing_series = next((s for s in series_entry if s["title"] == series_name), None)
-                    if existing_series:
-                        existing_series["content"].append(full_url)
-                        existing_series["extra_info"]["quality_details"].append(quality_detail_entry)
-                    else:
-                        indexes["series"][year_title.lower()].append({
-                            "title": series_name,
-                            "url": urljoin(base_url, series_name),
-                            "content": [full_url],
-                            "extra_info": {
-                                "added_date": datetime.now().isoformat(),
-                                "extracted_name": "",
-                                "extracted_year": "",
-                                "quality_details": [quality_detail_entry]
-                            }
-                        })
+                    record = {
+                        "key": year_title.lower(),
+                        "title": series_name,
+                        "url": urljoin(base_url, series_name),
+                        "added_date": datetime.now().isoformat(),
+                        "detail": quality_detail_entry
+                    }
+                    self._add_episode(indexes, record)
                     self.processed_urls.add(full_url)
+                    self._record_progress(indexes, record)
                 else:
                     stack.append(full_url)
 
-    def create_index(self):
-        indexes = self._load_progress()
-        start_index = indexes.get("last_processed", {}).get("index", self.working_index[0])
-
-        for index in self.working_index[self.working_index.index(start_index):]:
-            url = f"https://dl{index}.sermoviedown.pw/Series"
-            soup = self._fetch(url)
-            if not soup:
-                continue
-
-            links = soup.find_all("a")
-            for link in links:
-                if not link.get("title"):
-                    continue
-            
-                year_url = f"{url}/{link.get('href')}"
-                soup = self._fetch(year_url)
+    async def _process_year(self, year_url: str, indexes: Dict) -> None:
+        year_soup = await self._fetch(year_url)
+        if not year_soup:
+            return
 
-                series_links = soup.find_all("a")
-                for link in series_links:
-                    if not link.get("title"):
-                        continue
+        await asyncio.gather(*(
+            self._process_series(urljoin(year_url, series_link.attributes.get("href")), indexes)
+            for series_link in year_soup.css(TITLED_ANCHORS)
+            if series_link.attributes.get("title")
+        ))
 
-                    series_url = urljoin(year_url, link.get("href"))
-                    self._process_series(series_url, indexes)
+    async def _index_host(self, index: int, indexes: Dict) -> None:
+        url = f"https://dl{index}.sermoviedown.pw/Series"
+        soup = await self._fetch(url)
+        if not soup:
+            return
 
-        indexes.pop("last_processed", None)
+        await asyncio.gather(*(
+            self._process_year(f"{url}/{link.attributes.get('href')}", indexes)
+            for link in soup.css(TITLED_ANCHORS)
+            if link.attributes.get("title")
+        ))
@@ -1,7 +1,8 @@
 from indexers.movies import MoviesIndexer
 from indexers.series import SeriesIndexer
 from concurrent.futures import ProcessPoolExecutor, as_completed
-from typing import Callable
+from typing import Awaitable, Callable
+import asyncio
 import logging
 import time
 
@@ -16,12 +17,12 @@ def setup_logging() -> None:
         ]
     )
 
-def run_indexer(indexer_func: Callable, name: str) -> dict:
+def run_indexer(indexer_func: Callable[[], Awaitable[None]], name: str) -> dict:
     """
-    Execute an indexer function with error handling and logging.
+    Execute an indexer coroutine function with error handling and logging.
     
     Args:
-        indexer_func: The indexing function to execute
+        indexer_func: The async indexing function to execute
         name: Name of the indexer for logging purposes
     
     Returns:
@@ -32,7 +33,7 @@ def run_indexer(indexer_func: Callable, name: str) -> dict:
     
     try:
         logger.info(f"Starting {name} indexing process")
-        indexer_func()
+        asyncio.run(indexer_func())
         execution_time = time.time() - start_time
         logger.info(f"Completed {name} indexing in {execution_time:.2f} seconds")
         return {
@@ -40,6 +41,15 @@ def run_indexer(indexer_func: Callable, name: str) -> dict:
             "status": "success",
             "execution_time": execution_time
         }
+    except asyncio.CancelledError:
+        execution_time = time.time() - start_time
+        logger.warning(f"{name} indexing was cancelled after {execution_time:.2f} seconds")
+        return {
+            "name": name,
+            "status": "failed",
+            "error": "cancelled",
+            "execution_time": execution_time
+        }
     except Exception as e:
         execution_time = time.time() - start_time
         logger.error(f"Error in {name} indexing: {str(e)}", exc_info=True)
@@ -63,7 +73,7 @@ def main():
     results = []
     start_time = time.time()
     
-    with ProcessPoolExecutor(max_workers=4) as executor:
+    with ProcessPoolExecutor(max_workers=len(indexers)) as executor:
         # Submit all indexing tasks
         future_to_indexer = {
             executor.submit(run_indexer, func, name): name 